@@ -2,22 +2,61 @@
 VibeGuard API Server
 
 Main API server for the VibeGuard compliance platform.
+
+`python -m api.server` starts Flask's built-in server for local use. In
+production, run the app under a multi-process WSGI server instead, e.g.:
+
+    gunicorn -w $(nproc) -k gthread --threads 4 api.server:app
+
+and set VIBEGUARD_ANALYSIS_WORKERS=1 so each gunicorn worker doesn't
+also start a full-size analysis pool.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
 import sys
 import os
+import threading
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to Flask's stdlib JSON provider
+    orjson = None
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from detection.detector import analyze as analyze_combined, CombinedDetector
-from detection.stylometry import analyze_code, StylometryAnalyzer
+from detection.stylometry import (
+    analyze_code, cached_analysis, score_code, store_analysis, StyleFeatures, StylometryAnalyzer
+)
 from detection.security import scan_code as security_scan
+from detection.source import CodeView
+from detection.cache import worker_context
 from policy.engine import PolicyEngine, evaluate_commit, EXAMPLE_CONFIG
 
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, which encodes the large nested
+    results of the batch and scan endpoints several times faster than
+    the stdlib encoder. Types orjson can't handle natively go through
+    Flask's default conversions; sort_keys is honored as by the default
+    provider, and request parsing stays on the default loads.
+    """
+    
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_SORT_KEYS if kwargs.get('sort_keys', self.sort_keys) else 0
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
 CORS(app)
 
 # Initialize components
@@ -25,6 +64,136 @@ detector = CombinedDetector()
 stylometry = StylometryAnalyzer()
 policy_engine = PolicyEngine(EXAMPLE_CONFIG)
 
+# Batches smaller than this are analyzed inline; process start-up and
+# pickling would cost more than the analysis itself
+PARALLEL_MIN_FILES = 4
+ANALYSIS_WORKERS = int(os.environ.get('VIBEGUARD_ANALYSIS_WORKERS', 0)) or os.cpu_count() or 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Create the analysis worker pool on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=worker_context()
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next batch starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _analyze_contents(contents: List[str]) -> Iterator[Dict]:
+    """
+    Run AI detection over many files, yielding results in input order.
+    
+    Files already in the stylometry result cache are answered directly.
+    Analysis is CPU-bound regex/stylometry work, so larger batches of
+    misses are spread across worker processes and their results cached
+    here; each worker builds its own detector singletons on import.
+    """
+    if len(contents) < PARALLEL_MIN_FILES:
+        return (analyze_code(content) for content in contents)
+    
+    cached = [cached_analysis(content) for content in contents]
+    misses = [content for content, result in zip(contents, cached) if result is None]
+    if len(misses) < PARALLEL_MIN_FILES:
+        return (
+            analyze_code(content) if result is None else result
+            for content, result in zip(contents, cached)
+        )
+    
+    return _merge_scored(contents, cached, _score_in_pool(misses))
+
+
+def _merge_scored(
+    contents: List[str],
+    cached: List[Optional[Dict]],
+    scored: Iterator[Tuple[StyleFeatures, float]]
+) -> Iterator[Dict]:
+    """Fill cache misses, in order, from freshly scored results."""
+    for content, result in zip(contents, cached):
+        if result is None:
+            result = store_analysis(content, 'auto', next(scored))
+        yield result
+
+
+def _score_in_pool(contents: List[str]) -> Iterator[Tuple[StyleFeatures, float]]:
+    """
+    Score files in the worker pool, yielding results in input order.
+    
+    If a worker dies (e.g. OOM-killed on a huge file) the pool is broken
+    for good, so it is replaced for later batches and the rest of this
+    one is scored inline.
+    """
+    executor = _get_executor()
+    chunksize = max(1, len(contents) // (ANALYSIS_WORKERS * 4))
+    done = 0
+    try:
+        for scored in executor.map(score_code, contents, chunksize=chunksize):
+            done += 1
+            yield scored
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        for content in contents[done:]:
+            yield score_code(content)
+
+
+def _json_body() -> Optional[Dict]:
+    """
+    Parse the request's JSON object body once.
+    
+    Returns None when the request isn't declared as JSON, the body is
+    malformed, or it isn't an object; requests with the wrong content
+    type are rejected without attempting a parse.
+    """
+    if not request.is_json:
+        return None
+    
+    data = request.get_json(cache=True, silent=True)
+    return data if isinstance(data, dict) else None
+
+
+def _batch_summary(files_analyzed: int, ai_detected: int, total_ai_probability: float) -> Dict:
+    """Aggregate counts for a batch analysis response."""
+    avg_probability = total_ai_probability / files_analyzed if files_analyzed else 0
+    
+    return {
+        'files_analyzed': files_analyzed,
+        'ai_detected': ai_detected,
+        'human_written': files_analyzed - ai_detected,
+        'average_ai_probability': round(avg_probability, 3),
+    }
+
+
+def _stream_batch(files: List[Dict], results: Iterator[Dict]) -> Iterator[str]:
+    """Yield NDJSON lines: one per analyzed file, then the batch summary."""
+    files_analyzed = 0
+    ai_detected = 0
+    total_ai_probability = 0
+    
+    for file, result in zip(files, results):
+        result['path'] = file['path']
+        files_analyzed += 1
+        total_ai_probability += result['ai_probability']
+        if result['ai_probability'] > 0.7:
+            ai_detected += 1
+        yield app.json.dumps(result) + '\n'
+    
+    summary = _batch_summary(files_analyzed, ai_detected, total_ai_probability)
+    yield app.json.dumps({'summary': summary}) + '\n'
+
 
 @app.route('/api/health', methods=['GET'])
 def health():
@@ -48,7 +217,7 @@ def analyze():
         "filename": "src/utils.ts"  // optional
     }
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data or 'code' not in data:
         return jsonify({'error': 'Missing "code" in request body'}), 400
@@ -75,36 +244,39 @@ def analyze_batch():
             {"path": "src/bar.ts", "content": "..."}
         ]
     }
+    
+    With `?stream=1` the response is NDJSON instead: one line per file
+    result as it completes, then a final `{"summary": {...}}` line.
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data or 'files' not in data:
         return jsonify({'error': 'Missing "files" in request body'}), 400
     
+    files = [f for f in data['files'] if 'content' in f and 'path' in f]
+    analyzed = _analyze_contents([f['content'] for f in files])
+    
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return Response(
+            stream_with_context(_stream_batch(files, analyzed)),
+            mimetype='application/x-ndjson'
+        )
+    
     results = []
+    ai_detected = 0
     total_ai_probability = 0
     
-    for file in data['files']:
-        if 'content' not in file or 'path' not in file:
-            continue
-        
-        result = analyze_code(file['content'])
+    for file, result in zip(files, analyzed):
         result['path'] = file['path']
         results.append(result)
         total_ai_probability += result['ai_probability']
+        if result['ai_probability'] > 0.7:
+            ai_detected += 1
     
-    avg_probability = total_ai_probability / len(results) if results else 0
-    
-    ai_files = [r for r in results if r['ai_probability'] > 0.7]
-    human_files = [r for r in results if r['ai_probability'] <= 0.7]
+    response = _batch_summary(len(results), ai_detected, total_ai_probability)
+    response['results'] = results
     
-    return jsonify({
-        'files_analyzed': len(results),
-        'ai_detected': len(ai_files),
-        'human_written': len(human_files),
-        'average_ai_probability': round(avg_probability, 3),
-        'results': results
-    })
+    return jsonify(response)
 
 
 @app.route('/api/v1/evaluate', methods=['POST'])
@@ -124,7 +296,7 @@ def evaluate():
         "config": "..." // optional custom policy YAML
     }
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data:
         return jsonify({'error': 'Missing request body'}), 400
@@ -159,7 +331,7 @@ def scan():
         "config": "..."  // optional policy YAML
     }
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data or 'files' not in data:
         return jsonify({'error': 'Missing "files" in request body'}), 400
@@ -167,27 +339,28 @@ def scan():
     # Analyze each file
     analysis_results = []
     max_ai_confidence = 0
+    ai_detected = 0
     total_ai_lines = 0
     total_lines = 0
     
-    for file in data['files']:
-        if 'content' not in file or 'path' not in file:
-            continue
-        
-        result = analyze_code(file['content'])
-        lines = len(file['content'].split('\n'))
+    files = [f for f in data['files'] if 'content' in f and 'path' in f]
+    
+    for file, result in zip(files, _analyze_contents([f['content'] for f in files])):
+        lines = CodeView(file['content']).n_lines
+        is_ai = result['ai_probability'] > 0.7
         
         analysis_results.append({
             'path': file['path'],
             'ai_confidence': result['ai_probability'],
             'lines_changed': lines,
-            'status': 'ai-generated' if result['ai_probability'] > 0.7 else 'human-written'
+            'status': 'ai-generated' if is_ai else 'human-written'
         })
         
         if result['ai_probability'] > max_ai_confidence:
             max_ai_confidence = result['ai_probability']
         
-        if result['ai_probability'] > 0.7:
+        if is_ai:
+            ai_detected += 1
             total_ai_lines += lines
         total_lines += lines
     
@@ -209,8 +382,8 @@ def scan():
     return jsonify({
         'status': 'completed',
         'files_scanned': len(analysis_results),
-        'ai_detected': len([r for r in analysis_results if r['status'] == 'ai-generated']),
-        'human_written': len([r for r in analysis_results if r['status'] == 'human-written']),
+        'ai_detected': ai_detected,
+        'human_written': len(analysis_results) - ai_detected,
         'max_ai_confidence': round(max_ai_confidence, 3),
         'ai_percentage': round(ai_percentage, 1),
         'results': analysis_results,
@@ -232,7 +405,7 @@ def security():
         "language": "javascript"
     }
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data or 'code' not in data:
         return jsonify({'error': 'Missing "code" in request body'}), 400
@@ -256,12 +429,13 @@ def full_scan():
         "language": "javascript"
     }
     """
-    data = request.get_json()
+    data = _json_body()
     
     if not data or 'code' not in data:
         return jsonify({'error': 'Missing "code" in request body'}), 400
     
-    code = data['code']
+    # Both scans share one view, so the code is split into lines once
+    code = CodeView(data['code'])
     language = data.get('language', 'auto')
     
     # AI detection
@@ -315,7 +489,7 @@ def generate_report():
         "commits": [...]  // historical commit analyses
     }
     """
-    data = request.get_json()
+    data = _json_body() or {}
     report_type = data.get('type', 'summary')
     period = data.get('period', 'current')
     
@@ -344,4 +518,6 @@ def generate_report():
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # The debugger and reloader slow every request; opt in for development
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
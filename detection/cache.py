@@ -0,0 +1,59 @@
+"""
+VibeGuard Result Cache
+
+Bounded, content-addressed caches for analysis results.
+"""
+
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def content_hash(code: str) -> bytes:
+    """Return a short digest identifying source code by content."""
+    return hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def worker_context() -> multiprocessing.context.BaseContext:
+    """
+    Multiprocessing context for analysis worker pools.
+    
+    Workers are never forked: a fork can copy a cache lock that another
+    thread holds, and the child would deadlock on it.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+class LRUCache:
+    """
+    Thread-safe mapping that evicts the least recently used entry
+    once it holds more than `maxsize` items.
+    """
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, marking it most recently used."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entry if over capacity."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._data)
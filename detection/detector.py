@@ -6,11 +6,14 @@ Combines multiple detection methods for higher accuracy.
 
 from typing import Dict, Optional
 from dataclasses import dataclass
+from functools import lru_cache
 from .stylometry import StylometryAnalyzer, analyze_code as analyze_stylometry
 from .patterns import PatternDetector, detect_patterns
+from .source import CodeView
+from .cache import LRUCache, content_hash
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DetectionResult:
     ai_probability: float
     confidence: str
@@ -48,7 +51,8 @@ class CombinedDetector:
         self,
         code: str,
         language: str = "auto",
-        telemetry_hash: Optional[str] = None
+        telemetry_hash: Optional[str] = None,
+        detailed: bool = True
     ) -> DetectionResult:
         """
         Run combined detection on code.
@@ -57,21 +61,34 @@ class CombinedDetector:
             code: Source code to analyze
             language: Programming language (auto-detected if not specified)
             telemetry_hash: Optional hash from IDE telemetry for matching
+            detailed: Include per-method breakdown and top pattern matches.
+                Callers that only need the scores should pass False, which
+                also lets pattern matching stop once its score saturates.
             
         Returns:
             DetectionResult with combined score and details
         """
-        methods_used = []
+        methods_used = ["stylometry", "pattern_matching"]
         
-        # Run stylometry analysis
-        style_features = self.stylometry.analyze(code, language)
-        style_score = self.stylometry.calculate_ai_probability(style_features)
-        methods_used.append("stylometry")
-        
-        # Run pattern detection
-        pattern_result = self.patterns.detect(code)
+        # The same file recurs across scan, analyze and evaluate calls, so
+        # analyzer output is memoized by content; telemetry is always fresh
+        key = (content_hash(code), language, detailed)
+        cached = _ANALYSIS_CACHE.get(key)
+        if cached is None:
+            # Both analyzers share one view, so lines are split only once
+            view = CodeView(code)
+            
+            # Run stylometry analysis
+            style_features = self.stylometry.analyze(view, language)
+            style_score = self.stylometry.calculate_ai_probability(style_features)
+            
+            # Run pattern detection
+            pattern_result = self.patterns.detect(view, language, early_exit=not detailed, detailed=detailed)
+            
+            cached = (style_features, style_score, pattern_result)
+            _ANALYSIS_CACHE.put(key, cached)
+        style_features, style_score, pattern_result = cached
         pattern_score = pattern_result['pattern_score']
-        methods_used.append("pattern_matching")
         
         # Check telemetry if hash provided
         telemetry_score = 0
@@ -109,6 +126,16 @@ class CombinedDetector:
         else:
             confidence = "very_low"
         
+        if not detailed:
+            return DetectionResult(
+                ai_probability=round(combined, 3),
+                confidence=confidence,
+                stylometry_score=round(style_score, 3),
+                pattern_score=round(pattern_score, 3),
+                methods_used=methods_used,
+                details={}
+            )
+        
         return DetectionResult(
             ai_probability=round(combined, 3),
             confidence=confidence,
@@ -128,7 +155,8 @@ class CombinedDetector:
                 'patterns': {
                     'score': round(pattern_score, 3),
                     'patterns_matched': pattern_result['patterns_matched'],
-                    'top_patterns': pattern_result['matches'][:5] if pattern_result['matches'] else []
+                    # Copies: the cached match dicts must not be mutable by callers
+                    'top_patterns': [dict(m) for m in pattern_result['matches'][:5]]
                 },
                 'telemetry': {
                     'matched': telemetry_match,
@@ -144,14 +172,36 @@ class CombinedDetector:
         In production, this would query a database of telemetry events
         from IDE extensions.
         """
-        # TODO: Implement telemetry database lookup
-        return False
+        return _lookup_telemetry(code_hash)
+
+
+# (content hash, language, detailed) -> (StyleFeatures, style score, pattern result).
+# Serves analyze / analyze_file (the CLI); the API endpoints score through
+# stylometry.analyze_code, which has its own cache
+_ANALYSIS_CACHE = LRUCache(maxsize=2048)
+
+
+@lru_cache(maxsize=16384)
+def _lookup_telemetry(code_hash: str) -> bool:
+    """
+    Look up a telemetry hash, memoized process-wide.
+    
+    The same hash recurs whenever a snippet is copy-pasted across files
+    and commits, so repeated lookups are answered from memory.
+    """
+    # TODO: Implement telemetry database lookup
+    return False
+
+
+# Shared detector; detection is stateless, so one instance serves all calls
+_DETECTOR = CombinedDetector()
 
 
 def analyze(
     code: str,
     language: str = "auto",
-    telemetry_hash: Optional[str] = None
+    telemetry_hash: Optional[str] = None,
+    detailed: bool = True
 ) -> Dict:
     """
     Analyze code for AI generation.
@@ -160,12 +210,12 @@ def analyze(
         code: Source code to analyze
         language: Programming language
         telemetry_hash: Optional IDE telemetry hash
+        detailed: Include the per-method `details` breakdown
         
     Returns:
         Dict with analysis results
     """
-    detector = CombinedDetector()
-    result = detector.detect(code, language, telemetry_hash)
+    result = _DETECTOR.detect(code, language, telemetry_hash, detailed)
     
     return {
         'ai_probability': result.ai_probability,
@@ -177,27 +227,30 @@ def analyze(
     }
 
 
+# File extension -> language passed to the analyzers
+_LANG_MAP = {
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'tsx': 'typescript',
+    'jsx': 'javascript',
+    'go': 'go',
+    'rs': 'rust',
+    'java': 'java',
+    'kt': 'kotlin',
+    'rb': 'ruby',
+    'php': 'php',
+}
+
+
 def analyze_file(file_path: str) -> Dict:
     """Analyze a file for AI generation."""
     with open(file_path, 'r') as f:
         code = f.read()
     
     # Detect language from extension
-    ext = file_path.split('.')[-1] if '.' in file_path else ''
-    lang_map = {
-        'py': 'python',
-        'js': 'javascript',
-        'ts': 'typescript',
-        'tsx': 'typescript',
-        'jsx': 'javascript',
-        'go': 'go',
-        'rs': 'rust',
-        'java': 'java',
-        'kt': 'kotlin',
-        'rb': 'ruby',
-        'php': 'php',
-    }
-    language = lang_map.get(ext, 'auto')
+    _, dot, ext = file_path.rpartition('.')
+    language = _LANG_MAP.get(ext, 'auto') if dot else 'auto'
     
     result = analyze(code, language)
     result['file_path'] = file_path
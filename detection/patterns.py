@@ -6,10 +6,12 @@ Detects known AI code patterns and signatures.
 
 import re
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Pattern, Tuple, Union
 
+from .source import CodeView, as_view
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class PatternMatch:
     pattern_name: str
     confidence: float
@@ -18,6 +20,71 @@ class PatternMatch:
     snippet: str
 
 
+# A substring that every match of the named pattern must contain. When it
+# is absent from a file, the pattern is skipped without running the regex.
+REQUIRED_LITERALS = {
+    "copilot_try_catch": "catch",
+    "standard_error_throw": "throw",
+    "async_await_fetch": "fetch",
+    "promise_chain": ".catch",
+    "jsdoc_complete": "/**",
+    "inline_explanation": "//",
+    "descriptive_const": "const",
+    "response_data_pattern": "await",
+    "arrow_with_types": "=>",
+    "export_default_function": "export",
+    "use_effect_deps": "useEffect",
+    "use_state_destructure": "useState",
+    "grouped_imports": "import",
+    "interface_complete": "interface",
+    "type_alias": "type",
+    "python_docstring": '"""',
+    "python_type_hints": "->",
+    "python_try_except": "except",
+    "go_error_check": "nil",
+    "go_defer": "defer",
+    "numbered_steps": "//",
+    "todo_ai_style": "TODO:",
+}
+
+_JS_TS = frozenset({'javascript', 'typescript'})
+_C_STYLE_COMMENTS = frozenset({'javascript', 'typescript', 'go', 'rust', 'java', 'kotlin', 'php'})
+
+# Languages whose syntax a pattern can match. Patterns not listed apply to
+# every language.
+PATTERN_LANGUAGES = {
+    "copilot_try_catch": _JS_TS | {'kotlin'},
+    "standard_error_throw": _JS_TS | {'java', 'php'},
+    "async_await_fetch": _JS_TS,
+    "promise_chain": _JS_TS,
+    "jsdoc_complete": _JS_TS | {'java', 'kotlin', 'php'},
+    "inline_explanation": _C_STYLE_COMMENTS,
+    "descriptive_const": _JS_TS | {'go'},
+    "response_data_pattern": _JS_TS,
+    "arrow_with_types": _JS_TS,
+    "export_default_function": _JS_TS,
+    "use_effect_deps": _JS_TS,
+    "use_state_destructure": _JS_TS,
+    "grouped_imports": _JS_TS,
+    "interface_complete": _JS_TS,
+    "type_alias": _JS_TS,
+    "python_docstring": frozenset({'python'}),
+    "python_type_hints": frozenset({'python'}),
+    "python_try_except": frozenset({'python'}),
+    "go_error_check": frozenset({'go'}),
+    "go_defer": frozenset({'go'}),
+    "numbered_steps": _C_STYLE_COMMENTS,
+    "todo_ai_style": _C_STYLE_COMMENTS,
+}
+
+# Languages with a dedicated pattern subset; anything else (including
+# "auto") is scanned with every pattern
+_TAGGED_LANGUAGES = frozenset().union(*PATTERN_LANGUAGES.values())
+
+# (name, compiled regex, weight, required literal)
+CompiledPattern = Tuple[str, Pattern, float, Optional[str]]
+
+
 class PatternDetector:
     """
     Detects AI code patterns.
@@ -29,8 +96,33 @@ class PatternDetector:
     - Consistent naming patterns
     """
     
+    # Compiled once per process and shared by every detector instance
+    _compiled: Optional[Tuple[CompiledPattern, ...]] = None
+    # Same patterns, heaviest first, for scans that stop at a saturated score
+    _compiled_by_weight: Optional[Tuple[CompiledPattern, ...]] = None
+    # language -> (patterns, patterns heaviest first) applicable to it
+    _by_language: Dict[str, Tuple[Tuple[CompiledPattern, ...], Tuple[CompiledPattern, ...]]] = {}
+    
     def __init__(self):
         self.patterns = self._build_patterns()
+        if PatternDetector._compiled is None:
+            PatternDetector._compiled = tuple(
+                (
+                    name,
+                    re.compile(pattern, re.MULTILINE | re.DOTALL),
+                    weight,
+                    REQUIRED_LITERALS.get(name)
+                )
+                for name, pattern, weight in self.patterns
+            )
+            PatternDetector._compiled_by_weight = tuple(
+                sorted(PatternDetector._compiled, key=lambda p: p[2], reverse=True)
+            )
+            for language in _TAGGED_LANGUAGES:
+                PatternDetector._by_language[language] = tuple(
+                    tuple(p for p in compiled if _applies_to(p[0], language))
+                    for compiled in (PatternDetector._compiled, PatternDetector._compiled_by_weight)
+                )
     
     def _build_patterns(self) -> List[Tuple[str, str, float]]:
         """Build pattern list: (name, regex, confidence_weight)"""
@@ -38,7 +130,7 @@ class PatternDetector:
             # Error handling patterns
             (
                 "copilot_try_catch",
-                r'try\s*\{[^}]+\}\s*catch\s*\(\s*(?:error|err|e)\s*(?::\s*\w+)?\s*\)\s*\{[^}]*(?:console\.(?:error|log)|throw)[^}]*\}',
+                r'try\s*\{[^}]{1,512}\}\s*catch\s*\(\s*(?:error|err|e)\s*(?::\s*\w+)?\s*\)\s*\{[^}]{0,512}?(?:console\.(?:error|log)|throw)[^}]{0,512}\}',
                 0.15
             ),
             (
@@ -55,7 +147,7 @@ class PatternDetector:
             ),
             (
                 "promise_chain",
-                r"\.then\s*\(\s*(?:\([^)]*\)|[a-z]+)\s*=>\s*\{?[^}]*\}\s*\)\s*\.catch",
+                r"\.then\s*\(\s*(?:\([^)]*\)|[a-z]+)\s*=>\s*\{?[^}]{0,512}\}\s*\)\s*\.catch",
                 0.08
             ),
             
@@ -98,7 +190,7 @@ class PatternDetector:
             # React patterns
             (
                 "use_effect_deps",
-                r"useEffect\s*\(\s*\(\s*\)\s*=>\s*\{[^}]+\}\s*,\s*\[[^\]]*\]\s*\)",
+                r"useEffect\s*\(\s*\(\s*\)\s*=>\s*\{[^}]{1,512}\}\s*,\s*\[[^\]]*\]\s*\)",
                 0.08
             ),
             (
@@ -117,12 +209,12 @@ class PatternDetector:
             # Type patterns
             (
                 "interface_complete",
-                r"interface\s+\w+\s*\{(?:\s*\w+\s*:\s*\w+(?:<[^>]+>)?;?\s*){3,}\}",
+                r"interface\s+\w+\s*\{\s*(?:\w+\s*:\s*\w+\b(?:<[^>]+>)?;?\s*){3,}\}",
                 0.08
             ),
             (
                 "type_alias",
-                r"type\s+\w+\s*=\s*\{(?:\s*\w+\s*:\s*\w+(?:<[^>]+>)?;?\s*){2,}\}",
+                r"type\s+\w+\s*=\s*\{\s*(?:\w+\s*:\s*\w+\b(?:<[^>]+>)?;?\s*){2,}\}",
                 0.06
             ),
             
@@ -146,7 +238,7 @@ class PatternDetector:
             # Go patterns
             (
                 "go_error_check",
-                r"if\s+err\s*!=\s*nil\s*\{[^}]*return[^}]*\}",
+                r"if\s+err\s*!=\s*nil\s*\{[^}]{0,512}?return[^}]{0,512}\}",
                 0.12
             ),
             (
@@ -168,45 +260,75 @@ class PatternDetector:
             ),
         ]
     
-    def detect(self, code: str) -> Dict:
+    def detect(
+        self,
+        code: Union[str, CodeView],
+        language: str = "auto",
+        early_exit: bool = False,
+        detailed: bool = True
+    ) -> Dict:
         """
         Detect AI patterns in code.
         
+        Args:
+            code: Source code to analyze, or a CodeView of it
+            language: Programming language; known languages are only
+                scanned with the patterns that apply to them
+            early_exit: Stop scanning once the score saturates at 1.0.
+                The score is unaffected, but `patterns_matched` and
+                `matches` then only cover the patterns scanned so far.
+            detailed: Build per-match line ranges and snippets. When False,
+                matches are only counted and `matches` is empty.
+        
         Returns:
             Dict with pattern matches and overall score
         """
+        view = as_view(code)
+        code = view.code
         matches: List[PatternMatch] = []
+        match_count = 0
         total_weight = 0
-        lines = code.split('\n')
+        if language in self._by_language:
+            compiled = self._by_language[language][1 if early_exit else 0]
+        else:
+            compiled = self._compiled_by_weight if early_exit else self._compiled
         
-        for name, pattern, weight in self.patterns:
-            for match in re.finditer(pattern, code, re.MULTILINE | re.DOTALL):
-                # Find line numbers
-                start_pos = match.start()
-                end_pos = match.end()
-                
-                start_line = code[:start_pos].count('\n') + 1
-                end_line = code[:end_pos].count('\n') + 1
+        for name, regex, weight, literal in compiled:
+            if early_exit and total_weight >= 1.0:
+                break
+            if literal is not None and literal not in code:
+                continue
+            
+            for match in regex.finditer(code):
+                match_count += 1
+                total_weight += weight
                 
-                snippet = match.group(0)[:100]
-                if len(match.group(0)) > 100:
-                    snippet += "..."
+                if detailed:
+                    # Line offsets are only built once the first match needs them
+                    start_line = view.line_of(match.start())
+                    end_line = view.line_of(match.end())
+                    
+                    snippet = match.group(0)[:100]
+                    if len(match.group(0)) > 100:
+                        snippet += "..."
+                    
+                    matches.append(PatternMatch(
+                        pattern_name=name,
+                        confidence=weight,
+                        line_start=start_line,
+                        line_end=end_line,
+                        snippet=snippet
+                    ))
                 
-                matches.append(PatternMatch(
-                    pattern_name=name,
-                    confidence=weight,
-                    line_start=start_line,
-                    line_end=end_line,
-                    snippet=snippet
-                ))
-                total_weight += weight
+                if early_exit and total_weight >= 1.0:
+                    break
         
         # Normalize score (cap at 1.0)
         pattern_score = min(total_weight, 1.0)
         
         return {
             "pattern_score": round(pattern_score, 3),
-            "patterns_matched": len(matches),
+            "patterns_matched": match_count,
             "matches": [
                 {
                     "pattern": m.pattern_name,
@@ -220,10 +342,18 @@ class PatternDetector:
         }
 
 
-def detect_patterns(code: str) -> Dict:
+def _applies_to(pattern_name: str, language: str) -> bool:
+    """Whether a pattern can match code in the given language."""
+    languages = PATTERN_LANGUAGES.get(pattern_name)
+    return languages is None or language in languages
+
+
+_PATTERN_DETECTOR = PatternDetector()
+
+
+def detect_patterns(code: str, language: str = "auto") -> Dict:
     """Convenience function to detect patterns."""
-    detector = PatternDetector()
-    return detector.detect(code)
+    return _PATTERN_DETECTOR.detect(code, language)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,15 @@ VGX Security Scanner
 Pattern-based security vulnerability detection.
 """
 
+import os
 import re
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Pattern, Tuple, Union
 from dataclasses import dataclass
 
+from .cache import worker_context
+from .source import CodeView, as_view
+
 
 @dataclass
 class SecurityIssue:
@@ -19,7 +24,9 @@ class SecurityIssue:
     code_snippet: str
 
 
-# Security patterns
+# Security patterns. Spans are capped at 512 characters: an unbounded span
+# is rescanned from every candidate start, so crafted input that repeats a
+# pattern's prefix made scanning quadratic
 SECURITY_PATTERNS = {
     'hardcoded_secret': {
         'severity': 'critical',
@@ -36,18 +43,21 @@ SECURITY_PATTERNS = {
     'sql_injection': {
         'severity': 'high',
         'patterns': [
-            r'(?i)(execute|query|raw)\s*\(\s*["\']?\s*SELECT.*\+',
-            r'(?i)(execute|query|raw)\s*\(\s*f["\'].*SELECT',
-            r'(?i)cursor\.(execute|executemany)\s*\(\s*["\'].*%s.*%s',
-            r'(?i)\.query\s*\(\s*`[^`]*\$\{',  # Template literal SQL
-            r'(?i)SELECT\s+.*\s+FROM\s+.*\s+WHERE\s+.*\s*\+\s*(?:req|request|params|body|query)',
+            r'(?i)(execute|query|raw)\s*\(\s*["\']?\s*SELECT.{0,512}\+',
+            r'(?i)(execute|query|raw)\s*\(\s*f["\'].{0,512}SELECT',
+            r'(?i)cursor\.(execute|executemany)\s*\(\s*["\'].{0,512}%s.{0,512}%s',
+            r'(?i)\.query\s*\(\s*`[^`]{0,512}\$\{',  # Template literal SQL
+            # Lazy gaps find the first FROM / WHERE, and atomic groups commit
+            # to it so failed matches cannot backtrack through every keyword
+            # pairing; the first keyword is always the best one to take
+            r'(?i)SELECT(?>\s+\S(?:[^\n]{0,512}?\S)??\s+FROM(?=\s))(?>\s+\S(?:[^\n]{0,512}?\S)??\s+WHERE(?=\s))\s+(?:\S(?:[^\n]{0,512}?\S)?\s*)?\+\s*(?:req|request|params|body|query)',
         ],
         'message': 'Potential SQL injection vulnerability',
     },
     'xss': {
         'severity': 'high',
         'patterns': [
-            r'(?i)innerHTML\s*=\s*(?![\'"]\s*[\'"])',
+            r'(?i)innerHTML(?<=\binnerHTML)\s*=\s*(?![\'"]\s*[\'"])',
             r'(?i)document\.write\s*\(',
             r'(?i)\.html\s*\(\s*(?:req|request|params|data|input)',
             r'(?i)dangerouslySetInnerHTML',
@@ -59,7 +69,7 @@ SECURITY_PATTERNS = {
         'severity': 'high',
         'patterns': [
             r'(?i)(open|readFile|readFileSync|createReadStream)\s*\(\s*(?:req|request|params)',
-            r'(?i)path\.join\s*\([^)]*(?:req|request|params|body|query)',
+            r'(?i)path\.join\s*\([^)]{0,512}(?:req|request|params|body|query)',
             r'(?i)\.\./',
         ],
         'message': 'Potential path traversal vulnerability',
@@ -76,7 +86,9 @@ SECURITY_PATTERNS = {
     'eval_usage': {
         'severity': 'high',
         'patterns': [
-            r'\beval\s*\(',
+            # Word boundary checked after the literal so re can search for
+            # "eval" directly instead of testing \b at every position
+            r'eval(?<=\beval)\s*\(',
             r'(?i)exec\s*\(\s*(?:req|request|params|input)',
             r'Function\s*\(\s*["\']',
             r'(?i)subprocess\.(?:call|run|Popen)\s*\(\s*(?:req|request|params|input|shell\s*=\s*True)',
@@ -105,77 +117,175 @@ SECURITY_PATTERNS = {
 }
 
 
-def scan_code(code: str, language: str = "auto") -> Dict[str, Any]:
+# Lowercase literals that every match of a pattern must contain (any one
+# of them), in the same order as SECURITY_PATTERNS[vuln_type]['patterns'].
+# Files mentioning none of them skip that pattern's regex.
+REQUIRED_LITERALS = {
+    'hardcoded_secret': [
+        ('api', 'secret', 'auth', 'passw', 'pwd'),
+        ('aws',),
+        ('bearer',),
+        ('gh',),
+        ('sk-',),
+        ('private',),
+    ],
+    'sql_injection': [
+        ('select',),
+        ('select',),
+        ('cursor.',),
+        ('.query',),
+        ('select',),
+    ],
+    'xss': [
+        ('innerhtml',),
+        ('document.write',),
+        ('.html',),
+        ('dangerouslysetinnerhtml',),
+        ('v-html',),
+    ],
+    'path_traversal': [
+        ('open', 'readfile', 'createreadstream'),
+        ('path.join',),
+        ('../',),
+    ],
+    'insecure_random': [
+        ('math.random',),
+        ('random.random',),
+        ('rand',),
+    ],
+    'eval_usage': [
+        ('eval',),
+        ('exec',),
+        ('function',),
+        ('subprocess.',),
+    ],
+    'weak_crypto': [
+        ('md5',),
+        ('sha1',),
+        ('createhash',),
+        ('createhash',),
+        ('des', 'rc4'),
+    ],
+    'cors_wildcard': [
+        ('access-control-allow-origin',),
+        ('cors',),
+    ],
+}
+
+# Flattened at import: (vuln_type, compiled regex, config, required literals)
+_COMPILED_PATTERNS: Tuple[Tuple[str, Pattern, Dict[str, Any], Tuple[str, ...]], ...] = tuple(
+    (vuln_type, re.compile(pattern), config, literals)
+    for vuln_type, config in SECURITY_PATTERNS.items()
+    for pattern, literals in zip(config['patterns'], REQUIRED_LITERALS[vuln_type], strict=True)
+)
+
+
+def scan_code(code: Union[str, CodeView], language: str = "auto") -> Dict[str, Any]:
     """
     Scan code for security vulnerabilities.
     
     Args:
-        code: Source code to scan
+        code: Source code to scan, or a CodeView of it
         language: Programming language
         
     Returns:
         Dict with security scan results
     """
     issues: List[Dict] = []
-    lines = code.split('\n')
+    seen = set()
+    view = as_view(code)
+    code = view.code
+    lines = view.lines
+    line_starts = view.line_starts
     
-    for vuln_type, config in SECURITY_PATTERNS.items():
-        for pattern in config['patterns']:
-            try:
-                for match in re.finditer(pattern, code):
-                    # Find line number
-                    start = match.start()
-                    line_num = code[:start].count('\n') + 1
-                    
-                    # Get code snippet
-                    if line_num <= len(lines):
-                        snippet = lines[line_num - 1].strip()
-                    else:
-                        snippet = match.group(0)[:50]
-                    
-                    issues.append({
-                        'type': vuln_type,
-                        'severity': config['severity'],
-                        'message': config['message'],
-                        'line': line_num,
-                        'column': match.start() - code.rfind('\n', 0, start),
-                        'snippet': snippet[:100],
-                    })
-            except re.error:
-                continue
+    # Case-insensitive patterns can match non-ASCII lookalikes (e.g. U+0130
+    # for "i") that lowercasing does not map back, so only ASCII sources
+    # are prefiltered
+    lowered = code.lower() if code.isascii() else None
     
-    # Deduplicate by line
-    seen = set()
-    unique_issues = []
-    for issue in issues:
-        key = (issue['type'], issue['line'])
-        if key not in seen:
+    # One pass per pattern rather than a single alternation: alternatives
+    # consume each other's text, so overlapping findings would be lost
+    for vuln_type, regex, config, literals in _COMPILED_PATTERNS:
+        if lowered is not None and not any(literal in lowered for literal in literals):
+            continue
+        for match in regex.finditer(code):
+            # Report each type at most once per line, keeping the first hit
+            start = match.start()
+            line_num = view.line_of(start)
+            key = (vuln_type, line_num)
+            if key in seen:
+                continue
             seen.add(key)
-            unique_issues.append(issue)
+            column = start - line_starts[line_num - 1] + 1
+            
+            issues.append({
+                'type': vuln_type,
+                'severity': config['severity'],
+                'message': config['message'],
+                'line': line_num,
+                'column': column,
+                'snippet': lines[line_num - 1].strip()[:100],
+            })
     
     # Sort by severity
     severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-    unique_issues.sort(key=lambda x: severity_order.get(x['severity'], 4))
+    issues.sort(key=lambda x: severity_order.get(x['severity'], 4))
     
     # Summary
-    critical = sum(1 for i in unique_issues if i['severity'] == 'critical')
-    high = sum(1 for i in unique_issues if i['severity'] == 'high')
-    medium = sum(1 for i in unique_issues if i['severity'] == 'medium')
-    low = sum(1 for i in unique_issues if i['severity'] == 'low')
+    critical = sum(1 for i in issues if i['severity'] == 'critical')
+    high = sum(1 for i in issues if i['severity'] == 'high')
+    medium = sum(1 for i in issues if i['severity'] == 'medium')
+    low = sum(1 for i in issues if i['severity'] == 'low')
     
     return {
-        'issues': unique_issues,
+        'issues': issues,
         'summary': {
-            'total': len(unique_issues),
+            'total': len(issues),
             'critical': critical,
             'high': high,
             'medium': medium,
             'low': low,
         },
-        'passed': len(unique_issues) == 0,
+        'passed': len(issues) == 0,
     }
 
 
+# Below this many files, worker start-up costs more than the scan itself
+PARALLEL_MIN_FILES = 4
+
+
+def _scan_one(file: Tuple[str, str]) -> Dict[str, Any]:
+    """Scan one (path, code) pair; module-level so workers can unpickle it."""
+    path, code = file
+    result = scan_code(code)
+    result['path'] = path
+    return result
+
+
+def scan_files(files: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """
+    Scan many files for security vulnerabilities.
+    
+    Scanning is CPU-bound regex work, so larger batches are spread
+    across worker processes; each worker compiles the patterns once on
+    import.
+    
+    Args:
+        files: (path, code) pairs
+        
+    Returns:
+        One scan_code result per file, in input order, each with its `path`
+    """
+    if len(files) < PARALLEL_MIN_FILES:
+        return [_scan_one(file) for file in files]
+    
+    with ProcessPoolExecutor(
+        max_workers=min(8, os.cpu_count() or 2),
+        mp_context=worker_context()
+    ) as executor:
+        return list(executor.map(_scan_one, files, chunksize=4))
+
+
 if __name__ == "__main__":
     # Test security scanning
     test_code = '''
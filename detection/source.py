@@ -0,0 +1,53 @@
+"""
+VibeGuard Source View
+
+Line structure of a source file, derived once and shared by detectors.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Union
+
+
+@dataclass
+class CodeView:
+    """
+    Source code plus lazily computed line information.
+    
+    Build one per file and pass it to each analyzer; the split lines and
+    the line-start offsets are each computed at most once.
+    """
+    code: str
+    
+    @cached_property
+    def lines(self) -> List[str]:
+        """The code split on newlines."""
+        return self.code.split('\n')
+    
+    @cached_property
+    def line_starts(self) -> array:
+        """Offset of the first character of every line."""
+        starts = array('i', [0])
+        starts.extend(m.end() for m in re.finditer('\n', self.code))
+        return starts
+    
+    @property
+    def n_lines(self) -> int:
+        """Number of lines, counting a trailing partial line."""
+        if 'lines' in self.__dict__:
+            return len(self.lines)
+        return self.code.count('\n') + 1
+    
+    def line_of(self, offset: int) -> int:
+        """1-based line number of the character at offset."""
+        return bisect_right(self.line_starts, offset)
+
+
+def as_view(source: Union[str, CodeView]) -> CodeView:
+    """Wrap plain source code in a CodeView, passing views through."""
+    if isinstance(source, CodeView):
+        return source
+    return CodeView(source)
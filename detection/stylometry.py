@@ -11,13 +11,16 @@ AI-generated code tends to have:
 - Higher boilerplate ratio
 """
 
+import math
 import re
 from dataclasses import dataclass
-from typing import List, Dict, Optional
-import statistics
+from typing import List, Dict, Optional, Tuple, Union
 
+from .cache import LRUCache, content_hash
+from .source import CodeView, as_view
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class StyleFeatures:
     naming_consistency: float      # 0-1, higher = more consistent (AI signal)
     comment_density: float         # comments per line
@@ -48,6 +51,25 @@ class StylometryAnalyzer:
             r'interface\s+\w+\s*\{',  # Interface definitions
             r'type\s+\w+\s*=\s*\{',  # Type definitions
         ]
+        # A literal each pattern above needs, in the same order; files that
+        # never contain it skip the regex entirely
+        self.boilerplate_keywords = [
+            'try',
+            'if',
+            'async',
+            'const',
+            'export',
+            'import',
+            '@',
+            'public',
+            'private',
+            'interface',
+            'type',
+        ]
+        self._boilerplate_compiled = [
+            (keyword, re.compile(pattern))
+            for pattern, keyword in zip(self.boilerplate_patterns, self.boilerplate_keywords, strict=True)
+        ]
         
         self.ai_comment_patterns = [
             r'//\s*TODO:?\s*\w+',
@@ -56,28 +78,39 @@ class StylometryAnalyzer:
             r'#\s*[A-Z][a-z]+',  # Python comments starting with capital
         ]
 
-    def analyze(self, code: str, language: str = "auto") -> StyleFeatures:
+    def analyze(self, code: Union[str, CodeView], language: str = "auto") -> StyleFeatures:
         """
         Analyze code and extract style features.
         
         Args:
-            code: Source code to analyze
+            code: Source code to analyze, or a CodeView of it
             language: Programming language (auto-detected if not specified)
             
         Returns:
             StyleFeatures dataclass with extracted features
         """
-        lines = code.split('\n')
-        non_empty_lines = [l for l in lines if l.strip()]
+        view = as_view(code)
+        code = view.code
+        
+        # Too little code to carry a style signal (naming alone needs five
+        # identifiers); skip the sub-analyses and report neutral features
+        if len(code) < MIN_STYLE_CHARS:
+            return _NEUTRAL_FEATURES
+        
+        lines = view.lines
+        lengths, comment_density, indentation_consistency, empty_line_ratio = (
+            self._scan_lines(lines, language)
+        )
+        avg_line_length, line_length_variance = self._line_length_stats(lengths)
         
         return StyleFeatures(
             naming_consistency=self._analyze_naming(code),
-            comment_density=self._analyze_comments(lines, language),
-            avg_line_length=self._avg_line_length(non_empty_lines),
-            line_length_variance=self._line_length_variance(non_empty_lines),
-            indentation_consistency=self._analyze_indentation(lines),
-            boilerplate_ratio=self._analyze_boilerplate(code),
-            empty_line_ratio=self._empty_line_ratio(lines),
+            comment_density=comment_density,
+            avg_line_length=avg_line_length,
+            line_length_variance=line_length_variance,
+            indentation_consistency=indentation_consistency,
+            boilerplate_ratio=self._analyze_boilerplate(code, len(lines)),
+            empty_line_ratio=empty_line_ratio,
             max_nesting_depth=self._max_nesting_depth(code)
         )
 
@@ -87,13 +120,15 @@ class StylometryAnalyzer:
         Humans mix styles more often.
         """
         # Extract identifiers (simplified)
-        identifiers = re.findall(r'\b([a-z][a-zA-Z0-9_]*)\b', code)
+        identifiers = _IDENTIFIER.findall(code)
         
         if len(identifiers) < 5:
             return 0.5
         
-        camel_case = sum(1 for i in identifiers if re.match(r'^[a-z]+([A-Z][a-z]*)*$', i))
-        snake_case = sum(1 for i in identifiers if '_' in i and i.islower())
+        # Identifiers are ASCII and start lowercase, so camelCase
+        # ([a-z]+([A-Z][a-z]*)*) is exactly "letters only"
+        camel_case = sum(map(str.isalpha, identifiers))
+        snake_case = sum(map(str.islower, [i for i in identifiers if '_' in i]))
         
         total = len(identifiers)
         dominant_style_ratio = max(camel_case, snake_case) / total
@@ -101,71 +136,77 @@ class StylometryAnalyzer:
         # High consistency (>0.9) suggests AI
         return dominant_style_ratio
 
-    def _analyze_comments(self, lines: List[str], language: str) -> float:
-        """AI typically adds moderate, formulaic comments."""
-        comment_markers = {
-            'python': ['#'],
-            'javascript': ['//', '/*'],
-            'typescript': ['//', '/*'],
-            'go': ['//', '/*'],
-            'java': ['//', '/*'],
-            'auto': ['//', '#', '/*']
-        }
+    def _scan_lines(self, lines: List[str], language: str) -> Tuple[List[int], float, float, float]:
+        """
+        Collect every per-line signal in a single pass over the lines.
         
-        markers = comment_markers.get(language, comment_markers['auto'])
-        comment_lines = sum(
-            1 for l in lines 
-            if any(l.strip().startswith(m) for m in markers)
-        )
+        Returns:
+            (non-empty line lengths, comment density,
+             indentation consistency, empty line ratio)
+        """
+        markers = _COMMENT_MARKERS.get(language, _COMMENT_MARKERS['auto'])
+        lengths = []
+        empty = comments = indent_mod4_0 = indent_mod4_2 = 0
         
-        return comment_lines / max(len(lines), 1)
-
-    def _avg_line_length(self, lines: List[str]) -> float:
-        """AI tends toward consistent line lengths (~45-80 chars)."""
-        lengths = [len(l) for l in lines if l.strip()]
-        return statistics.mean(lengths) if lengths else 0
-
-    def _line_length_variance(self, lines: List[str]) -> float:
-        """Low variance in line length is an AI signal."""
-        lengths = [len(l) for l in lines if l.strip()]
-        if len(lengths) < 2:
-            return 0
-        return statistics.stdev(lengths)
-
-    def _analyze_indentation(self, lines: List[str]) -> float:
-        """AI has perfect indentation consistency."""
-        indents = []
         for line in lines:
-            if line.strip():
-                indent = len(line) - len(line.lstrip())
-                indents.append(indent)
+            stripped = line.lstrip()
+            if not stripped:
+                empty += 1
+                continue
+            lengths.append(len(line))
+            indent = (len(line) - len(stripped)) % 4
+            if indent == 0:
+                indent_mod4_0 += 1
+            elif indent == 2:
+                indent_mod4_2 += 1
+            if stripped.startswith(markers):
+                comments += 1
         
-        if not indents:
-            return 0.5
+        if lengths:
+            # AI has perfect indentation consistency: every indent is a
+            # multiple of 2 if any line uses a 2-space step, else of 4
+            consistent = indent_mod4_0 + indent_mod4_2 if indent_mod4_2 else indent_mod4_0
+            indentation_consistency = consistent / len(lengths)
+        else:
+            indentation_consistency = 0.5
         
-        # Check if indentation follows consistent pattern (2 or 4 spaces)
-        indent_unit = 2 if any(i % 2 == 0 and i % 4 != 0 for i in indents) else 4
-        consistent = sum(1 for i in indents if i % indent_unit == 0)
+        # AI typically adds moderate, formulaic comments and consistent spacing
+        total = max(len(lines), 1)
+        return lengths, comments / total, indentation_consistency, empty / total
+
+    def _line_length_stats(self, lengths: List[int]) -> Tuple[float, float]:
+        """
+        Mean and sample standard deviation of non-empty line lengths.
         
-        return consistent / len(indents)
+        AI tends toward consistent line lengths (~45-80 chars), and low
+        variance is an AI signal. Both come from one pass of integer sums.
+        """
+        n = len(lengths)
+        if not n:
+            return 0, 0
+        total = sum(lengths)
+        mean = total / n
+        if n < 2:
+            return mean, 0
+        total_sq = sum(k * k for k in lengths)
+        return mean, math.sqrt((n * total_sq - total * total) / (n * (n - 1)))
 
-    def _analyze_boilerplate(self, code: str) -> float:
+    def _analyze_boilerplate(self, code: str, line_count: int) -> float:
         """AI generates more standard patterns."""
-        matches = sum(len(re.findall(p, code)) for p in self.boilerplate_patterns)
-        lines = len(code.split('\n'))
-        return min(matches / max(lines / 10, 1), 1.0)
-
-    def _empty_line_ratio(self, lines: List[str]) -> float:
-        """AI tends to add consistent spacing."""
-        empty = sum(1 for l in lines if not l.strip())
-        return empty / max(len(lines), 1)
+        matches = sum(
+            len(regex.findall(code))
+            for keyword, regex in self._boilerplate_compiled
+            if keyword in code
+        )
+        return min(matches / max(line_count / 10, 1), 1.0)
 
     def _max_nesting_depth(self, code: str) -> int:
         """Calculate maximum nesting depth."""
         max_depth = 0
         current_depth = 0
         
-        for char in code:
+        # Only brackets affect depth; drop everything else in one C-level pass
+        for char in _NON_BRACKETS.sub('', code):
             if char in '{[(':
                 current_depth += 1
                 max_depth = max(max_depth, current_depth)
@@ -179,42 +220,116 @@ class StylometryAnalyzer:
         Weighted combination of features.
         Returns probability that code is AI-generated (0-1).
         """
-        weights = {
-            'naming_consistency': 0.20,
-            'indentation_consistency': 0.20,
-            'boilerplate_ratio': 0.20,
-            'comment_density': 0.10,
-            'line_length_variance': 0.15,
-            'empty_line_ratio': 0.10,
-            'nesting_depth': 0.05
-        }
-        
-        # Transform features to AI probability signals
-        signals = {
-            'naming_consistency': features.naming_consistency,  # High = AI
-            'indentation_consistency': features.indentation_consistency,  # High = AI
-            'boilerplate_ratio': features.boilerplate_ratio,  # High = AI
-            'comment_density': 1 - abs(features.comment_density - 0.15) * 5,  # ~15% is AI-like
-            'line_length_variance': max(0, 1 - features.line_length_variance / 30),  # Low variance = AI
-            'empty_line_ratio': 1 - abs(features.empty_line_ratio - 0.15) * 5,  # ~15% is AI-like
-            'nesting_depth': max(0, 1 - features.max_nesting_depth / 10)  # Shallow = AI
-        }
+        # Compared by value: features may have been pickled by a worker
+        if features == _NEUTRAL_FEATURES:
+            return 0.5
         
-        # Clip signals to [0, 1]
-        signals = {k: max(0, min(1, v)) for k, v in signals.items()}
+        # Transform features to AI probability signals, clipped to [0, 1]
+        naming = _clip(features.naming_consistency)  # High = AI
+        indentation = _clip(features.indentation_consistency)  # High = AI
+        boilerplate = _clip(features.boilerplate_ratio)  # High = AI
+        comments = _clip(1 - abs(features.comment_density - 0.15) * 5)  # ~15% is AI-like
+        variance = _clip(max(0, 1 - features.line_length_variance / 30))  # Low variance = AI
+        empty_lines = _clip(1 - abs(features.empty_line_ratio - 0.15) * 5)  # ~15% is AI-like
+        nesting = _clip(max(0, 1 - features.max_nesting_depth / 10))  # Shallow = AI
         
-        probability = sum(signals[k] * weights[k] for k in weights)
+        # Weights sum to 1.0
+        probability = (
+            naming * 0.20 +
+            indentation * 0.20 +
+            boilerplate * 0.20 +
+            comments * 0.10 +
+            variance * 0.15 +
+            empty_lines * 0.10 +
+            nesting * 0.05
+        )
         return probability
 
 
-def analyze_code(code: str, language: str = "auto") -> Dict:
+# Code shorter than this is given neutral features; line count is not a
+# bound, so minified or single-line files are still analyzed
+MIN_STYLE_CHARS = 120
+
+_NEUTRAL_FEATURES = StyleFeatures(
+    naming_consistency=0.5,
+    comment_density=0,
+    avg_line_length=0,
+    line_length_variance=0,
+    indentation_consistency=0.5,
+    boilerplate_ratio=0,
+    empty_line_ratio=0,
+    max_nesting_depth=0,
+)
+
+# Line prefixes that mark a comment, per language
+_COMMENT_MARKERS = {
+    'python': ('#',),
+    'javascript': ('//', '/*'),
+    'typescript': ('//', '/*'),
+    'go': ('//', '/*'),
+    'java': ('//', '/*'),
+    'auto': ('//', '#', '/*'),
+}
+
+# Same matches as \b[a-z][a-zA-Z0-9_]*\b, but leading with the character
+# class lets re skip ahead to candidate letters instead of testing \b at
+# every position
+_IDENTIFIER = re.compile(r'[a-z](?<=\b[a-z])[a-zA-Z0-9_]*\b')
+_NON_BRACKETS = re.compile(r'[^{}\[\]()]+')
+
+
+def _clip(value: float) -> float:
+    """Clamp a signal to [0, 1]."""
+    return max(0, min(1, value))
+
+
+_ANALYZER = StylometryAnalyzer()
+
+# (content hash, language) -> (StyleFeatures, probability)
+_RESULT_CACHE = LRUCache(maxsize=4096)
+
+
+def analyze_code(code: Union[str, CodeView], language: str = "auto") -> Dict:
     """
     Convenience function to analyze code and return results as dict.
+    
+    Results are memoized by content hash, so files resubmitted unchanged
+    (vendored or generated code across commits) skip re-analysis.
+    """
+    view = as_view(code)
+    key = (content_hash(view.code), language)
+    cached = _RESULT_CACHE.get(key)
+    if cached is None:
+        cached = score_code(view, language)
+        _RESULT_CACHE.put(key, cached)
+    return _result_dict(*cached)
+
+
+def cached_analysis(code: str, language: str = "auto") -> Optional[Dict]:
+    """Return the memoized analyze_code result for code, or None on a miss."""
+    cached = _RESULT_CACHE.get((content_hash(code), language))
+    return None if cached is None else _result_dict(*cached)
+
+
+def score_code(code: Union[str, CodeView], language: str = "auto") -> Tuple[StyleFeatures, float]:
     """
-    analyzer = StylometryAnalyzer()
-    features = analyzer.analyze(code, language)
-    probability = analyzer.calculate_ai_probability(features)
+    Compute (features, probability) without consulting the cache.
     
+    Used by worker processes; the caller records the result in its own
+    cache with store_analysis.
+    """
+    features = _ANALYZER.analyze(code, language)
+    return features, _ANALYZER.calculate_ai_probability(features)
+
+
+def store_analysis(code: str, language: str, scored: Tuple[StyleFeatures, float]) -> Dict:
+    """Memoize a score_code result for code and return it as analyze_code would."""
+    _RESULT_CACHE.put((content_hash(code), language), scored)
+    return _result_dict(*scored)
+
+
+def _result_dict(features: StyleFeatures, probability: float) -> Dict:
+    """Shape features and probability into the public result dict."""
     return {
         "ai_probability": round(probability, 3),
         "confidence": "high" if probability > 0.8 else "medium" if probability > 0.5 else "low",
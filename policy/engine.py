@@ -4,12 +4,15 @@ VibeGuard Policy Engine
 Evaluates commits against organization-defined policies.
 """
 
+import operator
+import os
 import re
 import yaml
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Pattern
 from enum import Enum
-from fnmatch import fnmatch
+from fnmatch import translate
+from functools import lru_cache
 
 
 class Action(Enum):
@@ -27,6 +30,30 @@ class Trigger:
     review_time: Optional[str] = None        # "< 2 minutes"
     paths: List[str] = field(default_factory=list)
     checks: List[str] = field(default_factory=list)
+    
+    # Comparators compiled from the conditions above; None when unset
+    ai_confidence_cmp: Optional[Callable[[float], bool]] = field(default=None, init=False, repr=False, compare=False)
+    ai_percentage_cmp: Optional[Callable[[float], bool]] = field(default=None, init=False, repr=False, compare=False)
+    lines_changed_cmp: Optional[Callable[[float], bool]] = field(default=None, init=False, repr=False, compare=False)
+    review_time_cmp: Optional[Callable[[float], bool]] = field(default=None, init=False, repr=False, compare=False)
+    # All path globs translated into one regex; None when unrestricted
+    paths_re: Optional[Pattern] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Conditions are fixed once parsed, so compile them up front
+        # instead of re-parsing on every evaluation
+        if self.ai_confidence:
+            self.ai_confidence_cmp = _compile_threshold(self.ai_confidence)
+        if self.ai_percentage:
+            self.ai_percentage_cmp = _compile_threshold(self.ai_percentage)
+        if self.lines_changed:
+            self.lines_changed_cmp = _compile_threshold(self.lines_changed)
+        if self.review_time:
+            self.review_time_cmp = _compile_time_threshold(self.review_time)
+        if self.paths:
+            self.paths_re = re.compile('|'.join(
+                translate(os.path.normcase(pattern)) for pattern in self.paths
+            ))
 
 
 @dataclass
@@ -48,6 +75,13 @@ class CommitAnalysis:
     total_lines_changed: int    # Total lines changed
     review_time_seconds: Optional[int] = None
     security_issues: List[Dict] = field(default_factory=list)
+    _issue_types: set = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Every policy's checks ask "is there an issue of type X?"
+        self._issue_types = {
+            issue.get('type') for issue in self.security_issues if isinstance(issue, dict)
+        }
 
 
 @dataclass
@@ -175,7 +209,7 @@ class PolicyEngine:
         
         # Check path restrictions
         if policy.trigger.paths:
-            matched_files = self._match_paths(policy.trigger.paths, analysis.files)
+            matched_files = self._match_paths(policy.trigger.paths_re, analysis.files)
             if not matched_files:
                 return result
             result['matched_files'] = matched_files
@@ -193,113 +227,92 @@ class PolicyEngine:
 
     def _trigger_matches(self, trigger: Trigger, analysis: CommitAnalysis) -> bool:
         """Check if trigger conditions match the analysis."""
-        if trigger.ai_confidence:
-            if not self._compare_threshold(trigger.ai_confidence, analysis.max_ai_confidence * 100):
-                return False
+        if trigger.ai_confidence_cmp and not trigger.ai_confidence_cmp(analysis.max_ai_confidence * 100):
+            return False
         
-        if trigger.ai_percentage:
-            if not self._compare_threshold(trigger.ai_percentage, analysis.ai_percentage):
-                return False
+        if trigger.ai_percentage_cmp and not trigger.ai_percentage_cmp(analysis.ai_percentage):
+            return False
         
-        if trigger.lines_changed:
-            if not self._compare_threshold(trigger.lines_changed, analysis.total_lines_changed):
-                return False
+        if trigger.lines_changed_cmp and not trigger.lines_changed_cmp(analysis.total_lines_changed):
+            return False
         
-        if trigger.review_time and analysis.review_time_seconds is not None:
-            # Convert "< 2 minutes" to seconds comparison
-            if not self._compare_time_threshold(trigger.review_time, analysis.review_time_seconds):
+        if trigger.review_time_cmp and analysis.review_time_seconds is not None:
+            # "< 2 minutes" was resolved to seconds at parse time
+            if not trigger.review_time_cmp(analysis.review_time_seconds):
                 return False
         
         return True
 
-    def _compare_threshold(self, condition: str, value: float) -> bool:
-        """
-        Compare a value against a threshold condition.
-        
-        Examples:
-            "> 70%" with value 85 -> True
-            "< 50" with value 30 -> True
-        """
-        match = re.match(r'([<>=]+)\s*(\d+(?:\.\d+)?)\s*%?', condition.strip())
-        if not match:
-            return False
-        
-        operator, threshold = match.groups()
-        threshold = float(threshold)
-        
-        if operator == '>':
-            return value > threshold
-        elif operator == '>=':
-            return value >= threshold
-        elif operator == '<':
-            return value < threshold
-        elif operator == '<=':
-            return value <= threshold
-        elif operator == '==' or operator == '=':
-            return value == threshold
-        
-        return False
-
-    def _compare_time_threshold(self, condition: str, seconds: int) -> bool:
-        """Compare time threshold (e.g., "< 2 minutes")."""
-        match = re.match(r'([<>=]+)\s*(\d+)\s*(second|minute|hour)s?', condition.strip())
-        if not match:
-            return False
-        
-        operator, amount, unit = match.groups()
-        amount = int(amount)
-        
-        multipliers = {'second': 1, 'minute': 60, 'hour': 3600}
-        threshold_seconds = amount * multipliers.get(unit, 1)
-        
-        return self._compare_threshold(f"{operator} {threshold_seconds}", seconds)
-
-    def _match_paths(self, patterns: List[str], files: List[Dict]) -> List[str]:
-        """Match file paths against glob patterns."""
-        matched = []
-        for f in files:
-            path = f['path']
-            for pattern in patterns:
-                if fnmatch(path, pattern):
-                    matched.append(path)
-                    break
-        return matched
+    def _match_paths(self, paths_re: Pattern, files: List[Dict]) -> List[str]:
+        """Match file paths against a policy's compiled path globs."""
+        return [f['path'] for f in files if paths_re.match(os.path.normcase(f['path']))]
 
     def _run_checks(self, checks: List[str], analysis: CommitAnalysis) -> bool:
         """Run security checks and return True if all pass."""
-        check_types = {
-            'hardcoded_secrets': self._check_secrets,
-            'sql_injection': self._check_sql_injection,
-            'xss_patterns': self._check_xss,
-        }
-        
         for check in checks:
-            if check in check_types:
-                if not check_types[check](analysis):
-                    return False
+            issue_type = _CHECK_TO_TYPE.get(check)
+            if issue_type is not None and issue_type in analysis._issue_types:
+                return False
         
         return True
 
-    def _check_secrets(self, analysis: CommitAnalysis) -> bool:
-        """Check for hardcoded secrets."""
-        for issue in analysis.security_issues:
-            if issue.get('type') == 'hardcoded_secret':
-                return False
-        return True
 
-    def _check_sql_injection(self, analysis: CommitAnalysis) -> bool:
-        """Check for SQL injection vulnerabilities."""
-        for issue in analysis.security_issues:
-            if issue.get('type') == 'sql_injection':
-                return False
-        return True
+# Security check name -> issue type that fails it
+_CHECK_TO_TYPE = {
+    'hardcoded_secrets': 'hardcoded_secret',
+    'sql_injection': 'sql_injection',
+    'xss_patterns': 'xss',
+}
 
-    def _check_xss(self, analysis: CommitAnalysis) -> bool:
-        """Check for XSS vulnerabilities."""
-        for issue in analysis.security_issues:
-            if issue.get('type') == 'xss':
-                return False
-        return True
+_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '=': operator.eq,
+}
+
+_TIME_UNITS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+
+def _never(value: float) -> bool:
+    """Comparator for conditions that could not be parsed."""
+    return False
+
+
+def _make_comparator(op_symbol: str, threshold: float) -> Callable[[float], bool]:
+    """Bind an operator symbol and threshold into a one-argument test."""
+    op = _OPERATORS.get(op_symbol)
+    if op is None:
+        return _never
+    return lambda value: op(value, threshold)
+
+
+def _compile_threshold(condition: str) -> Callable[[float], bool]:
+    """
+    Compile a threshold condition into a comparator.
+    
+    Examples:
+        "> 70%" -> matches 85
+        "< 50" -> matches 30
+    """
+    match = re.match(r'([<>=]+)\s*(\d+(?:\.\d+)?)\s*%?', condition.strip())
+    if not match:
+        return _never
+    
+    op_symbol, threshold = match.groups()
+    return _make_comparator(op_symbol, float(threshold))
+
+
+def _compile_time_threshold(condition: str) -> Callable[[float], bool]:
+    """Compile a time threshold (e.g., "< 2 minutes") into a comparator on seconds."""
+    match = re.match(r'([<>=]+)\s*(\d+)\s*(second|minute|hour)s?', condition.strip())
+    if not match:
+        return _never
+    
+    op_symbol, amount, unit = match.groups()
+    return _make_comparator(op_symbol, float(int(amount) * _TIME_UNITS[unit]))
 
 
 # Example configuration
@@ -353,6 +366,17 @@ policies:
 """
 
 
+@lru_cache(maxsize=32)
+def _engine_for(config_yaml: str) -> PolicyEngine:
+    """
+    Build the engine for a config, memoized per YAML string.
+    
+    Engines are not mutated by evaluation, and the CLI and API pass the
+    same config on every call, so parsing and compiling happen once.
+    """
+    return PolicyEngine(config_yaml)
+
+
 def evaluate_commit(config_yaml: str, analysis_dict: Dict) -> Dict:
     """
     Convenience function to evaluate a commit.
@@ -364,7 +388,7 @@ def evaluate_commit(config_yaml: str, analysis_dict: Dict) -> Dict:
     Returns:
         Dictionary with evaluation results
     """
-    engine = PolicyEngine(config_yaml)
+    engine = _engine_for(config_yaml)
     
     analysis = CommitAnalysis(
         files=analysis_dict.get('files', []),
@@ -0,0 +1,33 @@
+"""
+Regression checks for pathological inputs to the AI pattern regexes.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.patterns import detect_patterns
+
+# Unclosed members whose values could once be split into "value + next
+# key" at every character, which backtracked exponentially
+ADVERSARIAL_INPUTS = [
+    'interface X {' + 'a:bbbbbbbb' * 40,
+    'type X = {' + 'a:bbbbbbbb' * 40,
+    'interface X {' + ' a: b' * 2000,
+    'type X = {' + ' a: b' * 2000,
+]
+
+
+def test_adversarial_inputs_scan_quickly():
+    for code in ADVERSARIAL_INPUTS:
+        start = time.perf_counter()
+        detect_patterns(code, 'typescript')
+        assert time.perf_counter() - start < 0.5, code[:40]
+
+
+def test_complete_interfaces_still_match():
+    code = 'interface User {\n  id: number;\n  name: string;\n  tags: Array<string>;\n}'
+    result = detect_patterns(code, 'typescript')
+    assert any(m['pattern'] == 'interface_complete' for m in result['matches'])
@@ -0,0 +1,68 @@
+"""
+Regression checks for the security scanner's injection rules.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detection.security import PARALLEL_MIN_FILES, scan_code, scan_files
+
+# Concatenated SQL where a later "from" on the same line once captured the
+# FROM segment and the rule then failed to match at all
+SQL_INJECTIONS = [
+    'q = "SELECT * FROM users WHERE id = " + request.args["id"]  # id comes from the client',
+    'const sql = "SELECT * FROM orders WHERE user = \'" + req.user + "\'"; // copied from legacy',
+    'db.query("SELECT * FROM users WHERE id = " + req.params.id + " AND org IN (SELECT org FROM admins)")',
+]
+
+# Repeated rule prefixes with no terminator; each start position once
+# rescanned the rest of the input
+ADVERSARIAL_INPUTS = [
+    'path.join(' * 2000,
+    'execute(f"' * 2000,
+    'execute(SELECT' * 2000,
+    'cursor.execute("' * 2000,
+    '.query(`' * 2000,
+    'SELECT ' + ' FROM ' * 300 + ' WHERE ' * 300,
+]
+
+
+def _types(code):
+    return {issue['type'] for issue in scan_code(code)['issues']}
+
+
+def test_concatenated_sql_is_reported():
+    for code in SQL_INJECTIONS:
+        assert 'sql_injection' in _types(code), code
+
+
+def test_multiline_sql_is_reported():
+    code = '"SELECT *\n   FROM users\n   WHERE id = "\n    + req.body.id'
+    assert 'sql_injection' in _types(code)
+
+
+def test_adversarial_inputs_scan_quickly():
+    for code in ADVERSARIAL_INPUTS:
+        start = time.perf_counter()
+        scan_code(code)
+        assert time.perf_counter() - start < 0.5, code[:40]
+
+
+def _scan_files_keeps_order(count):
+    files = [(f'src/file{i}.js', f'const token = Math.random(); // {i}' if i % 2 else 'const x = 1;')
+             for i in range(count)]
+    results = scan_files(files)
+    assert [result['path'] for result in results] == [path for path, _ in files]
+    for (path, code), result in zip(files, results):
+        assert result == {**scan_code(code), 'path': path}
+
+
+def test_scan_files_inline():
+    _scan_files_keeps_order(PARALLEL_MIN_FILES - 1)
+
+
+def test_scan_files_in_worker_pool():
+    _scan_files_keeps_order(PARALLEL_MIN_FILES * 3)